@@ -5,10 +5,10 @@ Author: Jose Vicente Nunez
 """
 import argparse
 import textwrap
+import threading
 
 from reporter import __is_valid_limit__
-from reporter.rpm_query import QueryHelper
-import dearpygui.dearpygui as dpg
+from reporter.rpm_query import QueryHelper, __format_rows__
 
 TABLE_TAG = "query_table"
 MAIN_WINDOW_TAG = "main_window"
@@ -55,26 +55,26 @@ def __run_initial_query__(
         sorted_elem: bool
 ) -> None:
     """
-    Need to ensure the table gets removed.
-    See issue: https://github.com/hoffstadt/DearPyGui/issues/1350
+    Runs the query first and then replaces the table rows, so it can be called from a worker thread.
+    The table and its columns are created only once, only the rows are deleted and added again.
     :return:
     """
-    if dpg.does_alias_exist(TABLE_TAG):
-        dpg.delete_item(TABLE_TAG, children_only=False)
-    if dpg.does_alias_exist(TABLE_TAG):
-        dpg.remove_alias(TABLE_TAG)
-    with dpg.table(header_row=True, resizable=True, tag=TABLE_TAG, parent=MAIN_WINDOW_TAG):
-        dpg.add_table_column(label="Name", parent=TABLE_TAG)
-        dpg.add_table_column(label="Size (bytes)", default_sort=True, parent=TABLE_TAG)
-        with QueryHelper(
-                name=package,
-                limit=limit,
-                sorted_val=sorted_elem
-        ) as rpm_query:
-            for package in rpm_query:
-                with dpg.table_row(parent=TABLE_TAG):
-                    dpg.add_text(f"{package['name']}-{package['version']}")
-                    dpg.add_text(f"{package['size']:,.0f}")
+    rows = __format_rows__(*QueryHelper(
+        name=package,
+        limit=limit,
+        sorted_val=sorted_elem
+    ).collect())
+    with dpg.mutex():  # Render the rows in one go, not one frame per row
+        if not dpg.does_alias_exist(TABLE_TAG):
+            with dpg.table(header_row=True, resizable=True, tag=TABLE_TAG, parent=MAIN_WINDOW_TAG):
+                dpg.add_table_column(label="Name", parent=TABLE_TAG)
+                dpg.add_table_column(label="Size (bytes)", default_sort=True, parent=TABLE_TAG)
+        for row in dpg.get_item_children(TABLE_TAG, 1):  # Slot 1 holds the rows, slot 0 the columns
+            dpg.delete_item(row)
+        for package_name, package_size in rows:
+            with dpg.table_row(parent=TABLE_TAG):
+                dpg.add_text(package_name)
+                dpg.add_text(package_size)
 
 
 def __run__query__() -> None:
@@ -88,6 +88,7 @@ def __run__query__() -> None:
 if __name__ == "__main__":
 
     args = __cli_args__()
+    import dearpygui.dearpygui as dpg  # Skip loading the GUI toolkit when just asking for '--help'
 
     dpg.create_context()
     with dpg.window(label="RPM Search results", tag=MAIN_WINDOW_TAG):
@@ -111,14 +112,15 @@ if __name__ == "__main__":
             dpg.add_button(label="Reset", tag="reset", callback=__reset_form__)
             with dpg.tooltip("reset"):
                 dpg.add_text("Reset search filters")
-        __run_initial_query__(
-            package=args.name,
-            limit=args.limit,
-            sorted_elem=args.sort
-        )
 
     dpg.create_viewport(title='RPM Quick query tool')
     dpg.setup_dearpygui()
     dpg.show_viewport()
+    # Show the window right away, the initial results get added once the query finishes
+    threading.Thread(
+        target=__run_initial_query__,
+        kwargs={'package': args.name, 'limit': args.limit, 'sorted_elem': args.sort},
+        daemon=True
+    ).start()
     dpg.start_dearpygui()
     dpg.destroy_context()
@@ -6,9 +6,7 @@ Author: Jose Vicente Nunez
 import argparse
 import textwrap
 from reporter import __is_valid_limit__
-from reporter.rpm_query import QueryHelper
-from rich.table import Table
-from rich.progress import Progress
+from reporter.rpm_query import QueryHelper, __format_rows__
 
 if __name__ == "__main__":
 
@@ -33,18 +31,19 @@ if __name__ == "__main__":
     )
     args = parser.parse_args()
 
-    with QueryHelper(
+    from rich.table import Table
+    from rich.progress import Progress
+
+    rpm_table = Table(title="RPM package name and sizes")
+    rpm_table.add_column("Name", justify="right", style="cyan", no_wrap=True)
+    rpm_table.add_column("Size (bytes)", justify="right", style="green")
+    with Progress(transient=True) as progress:
+        progress.add_task("[red]RPM query...", start=False)  # Spinner only, the query reports no progress
+        names, versions, sizes = QueryHelper(
             name=args.name,
             limit=args.limit,
             sorted_val=args.sort
-    ) as rpm_query:
-        rpm_table = Table(title="RPM package name and sizes")
-        rpm_table.add_column("Name", justify="right", style="cyan", no_wrap=True)
-        rpm_table.add_column("Size (bytes)", justify="right", style="green")
-        with Progress(transient=True) as progress:
-            querying_task = progress.add_task("[red]RPM query...", start=False)
-            for package in rpm_query:
-                rpm_table.add_row(f"{package['name']}-{package['version']}", f"{package['size']:,.0f}")
-                progress.console.print(f"[yellow]Processed package: [green]{package['name']}-{package['version']}")
-            progress.update(querying_task, advance=100.0)
-            progress.console.print(rpm_table)
+        ).collect()
+    for package_name, package_size in __format_rows__(names, versions, sizes):
+        rpm_table.add_row(package_name, package_size)
+    progress.console.print(rpm_table)
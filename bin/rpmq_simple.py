@@ -7,7 +7,7 @@ import argparse
 import textwrap
 
 from reporter import __is_valid_limit__
-from reporter.rpm_query import QueryHelper
+from reporter.rpm_query import QueryHelper, __format_rows__
 
 if __name__ == "__main__":
 
@@ -32,11 +32,11 @@ if __name__ == "__main__":
     )
     args = parser.parse_args()
 
-    with QueryHelper(
+    names, versions, sizes = QueryHelper(
         name=args.name,
         limit=args.limit,
         sorted_val=args.sort
-    ) as rpm_query:
-        for package in rpm_query:
-            print(f"{package['name']}-{package['version']}: {package['size']:,.0f}")
+    ).collect()
+    for package_name, package_size in __format_rows__(names, versions, sizes):
+        print(f"{package_name}: {package_size}")
 
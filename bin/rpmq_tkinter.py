@@ -8,15 +8,57 @@ Author: Jose Vicente Nunez
 """
 import argparse
 import textwrap
+from concurrent.futures import Future, ThreadPoolExecutor
 from tkinter import *
 from tkinter.ttk import *
 from reporter import __is_valid_limit__
-from reporter.rpm_query import QueryHelper
+from reporter.rpm_query import QueryHelper, __format_rows__
+
+UPDATE_BATCH_SIZE = 200
+POLL_INTERVAL_MS = 50
+QUERY_EXECUTOR = ThreadPoolExecutor(max_workers=1)
+
+
+def __query_rows__(name: str, limit: int, sort: bool) -> list[tuple[str, str]]:
+    """
+    Run the RPM query and format the results. Runs outside the Tk main thread
+    :param name:
+    :param limit:
+    :param sort:
+    :return:
+    """
+    return __format_rows__(*QueryHelper(name=name, limit=limit, sorted_val=sort).collect())
+
+
+def __populate_table__(window: Tk, table: Treeview, future: Future) -> NONE:
+    """
+    Wait for the query to finish without blocking the main loop, then fill the table
+    :param window:
+    :param table:
+    :param future:
+    :return:
+    """
+    if not future.done():
+        window.after(POLL_INTERVAL_MS, __populate_table__, window, table, future)
+        return
+    table.delete(*table.get_children())  # Another search may have finished in the meantime
+    for row_id, values in enumerate(future.result(), start=1):
+        table.insert(
+            parent='',
+            index='end',
+            iid=str(row_id),
+            text='',
+            values=values
+        )
+        if row_id % UPDATE_BATCH_SIZE == 0:
+            window.update_idletasks()  # Refresh the UI once per batch of results
+    window.update_idletasks()
 
 
 def __initial__search__(*, window: Tk, name: str, limit: int, sort: bool, table: Treeview) -> NONE:
     """
-    Populate the table with an initial search using CLI args
+    Populate the table with an initial search using CLI args.
+    The RPM query runs on a worker thread, so the UI stays responsive
     :param window:
     :param name:
     :param limit:
@@ -24,20 +66,8 @@ def __initial__search__(*, window: Tk, name: str, limit: int, sort: bool, table:
     :param table:
     :return:
     """
-    with QueryHelper(name=name, limit=limit, sorted_val=sort) as rpm_query:
-        row_id = 0
-        for package in rpm_query:
-            package_name = f"{package['name']}-{package['version']}"
-            package_size = f"{package['size']:,.0f}"
-            table.insert(
-                parent='',
-                index='end',
-                iid=row_id,
-                text='',
-                values=(package_name, package_size)
-            )
-            window.update()  # Update the UI as soon we get results
-            row_id += 1
+    future = QUERY_EXECUTOR.submit(__query_rows__, name, limit, sort)
+    window.after(POLL_INTERVAL_MS, __populate_table__, window, table, future)
 
 
 def __create_table__(main_w: Tk) -> Treeview:
@@ -109,9 +139,8 @@ def __ui_search__() -> None:
     Re-do a search using UI filter settings
     :return:
     """
-    for i in results_tbl.get_children():
-        results_tbl.delete(i)
-        win.update()
+    results_tbl.delete(*results_tbl.get_children())
+    win.update_idletasks()
     __initial__search__(
         window=win, name=query_v.get(), limit=limit_v.get(), sort=sort_v.get(), table=results_tbl)
 
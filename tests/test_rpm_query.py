@@ -3,14 +3,33 @@ Unit tests for the QueryHelper class
 How to write unit tests: https://docs.python.org/3/library/unittest.html
 """
 import os
+import subprocess
+import sys
+import tempfile
 import unittest
-from reporter.rpm_query import QueryHelper
+from pathlib import Path
+
+import reporter.rpm_query
+from reporter.rpm_query import QueryHelper, __filter_names__, __format_rows__, __read_cache__, __top_k__
 
 DEBUG = True if os.getenv("DEBUG_RPM_QUERY") else False
 
 
 class QueryHelperTestCase(unittest.TestCase):
 
+    def setUp(self):
+        """
+        Keep the query cache away from the real ~/.cache/rpm_query
+        :return:
+        """
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.saved_cache_dir = reporter.rpm_query.CACHE_DIR
+        reporter.rpm_query.CACHE_DIR = Path(self.cache_dir.name)
+
+    def tearDown(self):
+        reporter.rpm_query.CACHE_DIR = self.saved_cache_dir
+        self.cache_dir.cleanup()
+
     def test_default(self):
         with QueryHelper() as rpm_query:
             for package in rpm_query:
@@ -29,6 +48,18 @@ class QueryHelperTestCase(unittest.TestCase):
                 self.assertIn('name', package, "Could not get 'name' in package?")
             self.assertEqual(LIMIT, count, f"Limit ({count}) did not worked!")
 
+    def test_get_sorted_counted_packages(self):
+        """
+        Sorted and limited queries must return the biggest packages
+        :return:
+        """
+        LIMIT = 10
+        with QueryHelper(sorted_val=True) as rpm_query:
+            expected = [package['size'] for package in rpm_query][:LIMIT]
+        with QueryHelper(limit=LIMIT, sorted_val=True) as rpm_query:
+            sizes = [package['size'] for package in rpm_query]
+        self.assertEqual(expected, sizes, "Did not get the biggest packages!")
+
     def test_get_all_packages(self):
         """
         Default query is all packages, sorted by size
@@ -65,6 +96,109 @@ class QueryHelperTestCase(unittest.TestCase):
                 found += 1
         self.assertGreater(found, 0, f"Could not find a single package with name {package_name}")
 
+    def test_collect(self):
+        """
+        Test collecting results as parallel lists
+        :return:
+        """
+        LIMIT = 10
+        names, versions, sizes = QueryHelper(limit=LIMIT).collect()
+        self.assertEqual(LIMIT, len(names), f"Limit ({len(names)}) did not worked!")
+        self.assertEqual(len(names), len(versions))
+        self.assertEqual(len(names), len(sizes))
+        self.assertEqual(sorted(sizes, reverse=True), sizes, "Returned entries not sorted by size in bytes!")
+
+    def test_collect_cached(self):
+        """
+        Cached results must match the results read from the RPM database
+        :return:
+        """
+        for package_name, mode in (
+                (None, QueryHelper.EXACT),
+                ("glibc-common", QueryHelper.EXACT),
+                ("glibc", QueryHelper.CONTAINS)
+        ):
+            QueryHelper(name=package_name, mode=mode).collect()  # Populate the cache
+            self.assertEqual(
+                QueryHelper(name=package_name, mode=mode, use_cache=False).collect(),
+                QueryHelper(name=package_name, mode=mode).collect()
+            )
+
+    def test_read_cache(self):
+        """
+        Unusable cache files must be ignored, not crash the query
+        :return:
+        """
+        cache_file = reporter.rpm_query.CACHE_DIR / "1.json"
+        self.assertIsNone(__read_cache__(cache_file))
+        for content in ('[]', '"x"', '{"names": ["a"]}', '{broken', '{"names": 1, "versions": 2, "sizes": 3}',
+                        '{"names": ["a", "b"], "versions": ["1"], "sizes": [1, 2]}'):
+            cache_file.write_text(content)
+            self.assertIsNone(__read_cache__(cache_file), f"Accepted cache: {content}")
+        cache_file.write_text('{"names": ["a"], "versions": ["1"], "sizes": [10]}')
+        self.assertEqual((['a'], ['1'], [10]), __read_cache__(cache_file))
+
+    def test_get_packages_containing_name(self):
+        """
+        Test partial name queries
+        :return:
+        """
+        with QueryHelper(name="glibc", mode=QueryHelper.CONTAINS) as rpm_query:
+            names = [package['name'] for package in rpm_query]
+        self.assertIn("glibc-common", names)
+        for name in names:
+            self.assertIn("glibc", name)
+
+    def test_filter_names(self):
+        """
+        Test exact and partial name matching
+        :return:
+        """
+        names = ['glibc', 'glibc-common', 'bash']
+        self.assertEqual([0], __filter_names__(names, 'glibc', QueryHelper.EXACT))
+        self.assertEqual([0, 1], __filter_names__(names, 'glibc', QueryHelper.CONTAINS))
+        self.assertEqual([], __filter_names__(names, 'zsh', QueryHelper.CONTAINS))
+
+    def test_top_k(self):
+        """
+        Test selection of the biggest sizes
+        :return:
+        """
+        self.assertEqual([3, 1], __top_k__([10, 30, 5, 40], 2))
+        self.assertEqual([3, 1, 0, 2], __top_k__([10, 30, 5, 40], 10))
+        sizes = [7, 3, 9, 3, 1, 8, 2, 6, 5, 4]
+        for k in range(len(sizes) + 1):
+            self.assertEqual(
+                sorted(range(len(sizes)), key=lambda i: sizes[i], reverse=True)[:k],
+                __top_k__(sizes, k)
+            )
+
+    def test_import_without_rpm(self):
+        """
+        'rpm' must only be imported when the database is used
+        :return:
+        """
+        code = (
+            "import sys\n"
+            "sys.modules['rpm'] = None\n"  # Makes 'import rpm' fail
+            "from reporter.rpm_query import __format_rows__, __top_k__\n"
+            "assert __top_k__([1, 3, 2], 2) == [1, 2]\n"
+            "assert __format_rows__(['a'], ['1'], [1000]) == [('a-1', '1,000')]\n"
+        )
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+        result = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True)
+        self.assertEqual(0, result.returncode, result.stderr)
+
+    def test_format_rows(self):
+        """
+        Test formatting of packages for display
+        :return:
+        """
+        self.assertEqual(
+            [('glibc-common-2.34', '8,000,123'), ('tiny-1.0', '12')],
+            __format_rows__(['glibc-common', 'tiny'], ['2.34', '1.0'], [8_000_123, 12])
+        )
+
 
 if __name__ == '__main__':
     unittest.main()